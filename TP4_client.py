@@ -55,12 +55,11 @@ class Client:
             auth_payload: gloutils.AuthPayload = {"username": username_temp, "password": password_temp}
             message: gloutils.GloMessage = {"header": gloutils.Headers.AUTH_REGISTER, "payload": auth_payload}
 
-            glosocket.snd_mesg(self._socket, message)
-            reponse: gloutils.GloMessage = eval(glosocket.recv_mesg(self._socket))
+            glosocket.snd_mesg(self._socket, json.dumps(message))
+            reponse: gloutils.GloMessage = json.loads(glosocket.recv_mesg(self._socket))
             
             if reponse["header"] == gloutils.Headers.OK:
-                self._username = reponse["payload"]["username"]
-                self._password = reponse["payload"]["password"]
+                self._username = username_temp
             
             elif reponse["header"] == gloutils.Headers.ERROR:
                 print(reponse["payload"]["error_message"])
@@ -86,12 +85,11 @@ class Client:
             auth_payload: gloutils.AuthPayload = {"username": username_temp, "password": password_temp}
             message: gloutils.GloMessage = {"header": gloutils.Headers.AUTH_LOGIN, "payload": auth_payload}
 
-            glosocket.snd_mesg(self._socket, message)
-            reponse: gloutils.GloMessage = eval(glosocket.recv_mesg(self._socket))
+            glosocket.snd_mesg(self._socket, json.dumps(message))
+            reponse: gloutils.GloMessage = json.loads(glosocket.recv_mesg(self._socket))
             
             if reponse["header"] == gloutils.Headers.OK:
-                self._username = reponse["payload"]["username"]
-                self._password = reponse["payload"]["password"]
+                self._username = username_temp
 
             elif reponse["header"] == gloutils.Headers.ERROR:
                 print(reponse["payload"]["error_message"])
@@ -108,7 +106,7 @@ class Client:
 
         try:
             message_bye: gloutils.GloMessage = {"header":gloutils.Headers.BYE}
-            glosocket.snd_mesg(self._socket, message_bye)
+            glosocket.snd_mesg(self._socket, json.dumps(message_bye))
             self._socket.close()
             
         except glosocket.GLOSocketError:
@@ -132,27 +130,29 @@ class Client:
         try:
             message: gloutils.GloMessage = {"header": gloutils.Headers.INBOX_READING_REQUEST}
 
-            glosocket.snd_mesg(self._socket, message)
-            reponse: gloutils.GloMessage = eval(glosocket.recv_mesg(self._socket))
+            glosocket.snd_mesg(self._socket, json.dumps(message))
+            reponse: gloutils.GloMessage = json.loads(glosocket.recv_mesg(self._socket))
             
-            if reponse["header"] != gloutils.EmailListPayload:
+            if reponse["header"] != gloutils.Headers.OK:
                 print("Il y a eu erreur côté serveur.")
                 return
 
-            # TODO Retourner au menu principal si liste vide
-
             email_list = reponse["payload"]["email_list"]
 
+            if not email_list:
+                print("Il n'y a aucun courriel à lire.")
+                return
+
             for email in email_list:
                 print(email)
 
-            num_courriel_a_consulter = self._user_choice_in_email_list(range(1, len(email_list)))
+            num_courriel_a_consulter = self._user_choice_in_email_list(range(1, len(email_list) + 1))
             
             email_choice_payload: gloutils.EmailChoicePayload = {"choice": num_courriel_a_consulter}
             message: gloutils.GloMessage = {"header": gloutils.Headers.INBOX_READING_CHOICE, "payload":email_choice_payload}
 
-            glosocket.snd_mesg(self._socket, message)
-            reponse: gloutils.GloMessage = eval(glosocket.recv_mesg(self._socket))
+            glosocket.snd_mesg(self._socket, json.dumps(message))
+            reponse: gloutils.GloMessage = json.loads(glosocket.recv_mesg(self._socket))
 
             formatted_email = f'{gloutils.SUBJECT_DISPLAY.format(**reponse["payload"])}\n{gloutils.EMAIL_DISPLAY.format(**reponse["payload"])}'
             print(formatted_email)
@@ -204,16 +204,16 @@ class Client:
         try:
             # Envoi au serveur
             send_email_payload: gloutils.EmailContentPayload = {"sender": self._username, "destination": adresse_destinataire, 
-                                                                "date": gloutils.get_current_utc_time, "subject": sujet, "content": contenu}
+                                                                "date": gloutils.get_current_utc_time(), "subject": sujet, "content": contenu}
             
             message: gloutils.GloMessage = {"header": gloutils.Headers.EMAIL_SENDING, "payload":send_email_payload}
 
             # Vérifier si le serveur a bien reçu
-            glosocket.snd_mesg(self._socket, message)
-            reponse: gloutils.GloMessage = eval(glosocket.recv_mesg(self._socket))
+            glosocket.snd_mesg(self._socket, json.dumps(message))
+            reponse: gloutils.GloMessage = json.loads(glosocket.recv_mesg(self._socket))
             
             
-            if reponse["header"] is gloutils.Headers.ERROR:
+            if reponse["header"] == gloutils.Headers.ERROR:
                 reponse_serveur = "Le serveur a rencontré une erreur lors de la demande d'envoi de courriel."  
             else:
                 reponse_serveur = "Le serveur a bien traité la demande d'envoi de courriel."
@@ -232,12 +232,12 @@ class Client:
             message: gloutils.GloMessage = {"header": gloutils.Headers.STATS_REQUEST}
         
             # Vérifier si le serveur a bien reçu
-            glosocket.snd_mesg(self._socket, message)
-            reponse: gloutils.GloMessage = eval(glosocket.recv_mesg(self._socket))
+            glosocket.snd_mesg(self._socket, json.dumps(message))
+            reponse: gloutils.GloMessage = json.loads(glosocket.recv_mesg(self._socket))
 
-            if reponse["header"] is gloutils.Headers.ERROR:
+            if reponse["header"] == gloutils.Headers.ERROR:
                 print("Le serveur a rencontré une erreur lors de la demande de statistiques.")
-            elif reponse["payload"] != gloutils.StatsPayload:
+            elif reponse["header"] != gloutils.Headers.OK:
                 print("Le client n'a pas reçu les statistiques.")
             else:
                 print(gloutils.STATS_DISPLAY.format(**reponse["payload"]))
@@ -254,11 +254,11 @@ class Client:
         """
         try:
             message: gloutils.GloMessage = {"header": gloutils.Headers.AUTH_LOGOUT}
-            glosocket.snd_mesg(self._socket, message)
+            glosocket.snd_mesg(self._socket, json.dumps(message))
 
-            reponse = eval(glosocket.recv_mesg(self._socket))
+            reponse = json.loads(glosocket.recv_mesg(self._socket))
 
-            if reponse["header"] is gloutils.Headers.ERROR:
+            if reponse["header"] == gloutils.Headers.ERROR:
                 print("Il y a eu une erreur côté serveur lors du traitement de la déconnexion.")
             else:
                 self._username = ""
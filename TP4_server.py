@@ -1,3 +1,4 @@
+import collections
 import hashlib
 import hmac
 import json
@@ -6,11 +7,122 @@ import select
 import socket
 import sys
 import re
+import time
 
 import glosocket
 import gloutils
 
 
+SESSION_KEY_SIZE = 32
+
+EMAIL_CACHE_MAX_ENTRIES = 1024
+EMAIL_CACHE_MAX_BYTES = 4 * 1024 * 1024
+# Coût approximatif d'une entrée dans l'OrderedDict (case et maillon)
+_CACHE_ENTRY_OVERHEAD = 100
+
+
+class _CachedEmail:
+    """
+    Ligne de sommaire déjà formatée d'un courriel et, s'il a été consulté,
+    son contenu décodé (`payload` vaut None pour une entrée de sommaire).
+    """
+    __slots__ = ("payload", "summary", "size")
+
+    def __init__(self, key: tuple[str, int], summary: str,
+                 payload: gloutils.EmailContentPayload | None = None) -> None:
+        self.payload = payload
+        self.summary = summary
+        # Taille mémoire réelle des objets conservés, clé comprise
+        self.size = (sys.getsizeof(self) + sys.getsizeof(summary)
+                     + sum(sys.getsizeof(part) for part in key)
+                     + sys.getsizeof(key) + _CACHE_ENTRY_OVERHEAD)
+        if payload is not None:
+            self.size += sys.getsizeof(payload) + sum(
+                sys.getsizeof(field) + sys.getsizeof(value)
+                for field, value in payload.items())
+
+
+class EmailCache:
+    """
+    Cache LRU des courriels lus, indexé par (utilisateur, numéro).
+
+    Le cache est borné à la fois en nombre d'entrées et en mémoire
+    occupée (en octets, mesurée avec sys.getsizeof) par les entrées.
+
+    Les entrées de sommaire (listage de la boîte) sont insérées du côté
+    le moins récent: parcourir une grande boîte évince d'abord ces
+    sommaires plutôt que les courriels consultés des autres utilisateurs.
+    """
+
+    def __init__(self, max_entries: int = EMAIL_CACHE_MAX_ENTRIES,
+                 max_bytes: int = EMAIL_CACHE_MAX_BYTES) -> None:
+        self._entries: collections.OrderedDict[tuple[str, int], _CachedEmail] = collections.OrderedDict()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str, number: int,
+            with_payload: bool = True) -> _CachedEmail | None:
+        """
+        Retourne l'entrée en cache, sinon None.
+
+        Avec `with_payload`, seule une entrée contenant le courriel décodé
+        compte comme un succès, et elle est marquée comme récente.
+        """
+        entry = self._entries.get((username, number))
+        if entry is None or (with_payload and entry.payload is None):
+            self.misses += 1
+            return None
+        if with_payload:
+            self._entries.move_to_end((username, number))
+        self.hits += 1
+        return entry
+
+    def put(self, username: str, number: int,
+            payload: gloutils.EmailContentPayload,
+            summary_only: bool = False) -> _CachedEmail:
+        """
+        Ajoute le courriel au cache et évince les plus anciens au besoin.
+
+        Avec `summary_only`, seul le sommaire est conservé, du côté le
+        moins récent du cache.
+        """
+        self.invalidate(username, number)
+        summary = gloutils.SUBJECT_DISPLAY.format(
+            number=number, sender=payload["sender"],
+            subject=payload["subject"], date=payload["date"])
+        key = (username, number)
+        entry = _CachedEmail(key, summary, None if summary_only else payload)
+        self._entries[key] = entry
+        if summary_only:
+            self._entries.move_to_end(key, last=False)
+        self._size += entry.size
+        while self._entries and (len(self._entries) > self._max_entries
+                                 or self._size > self._max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+        return entry
+
+    def invalidate(self, username: str, number: int) -> None:
+        """Retire un courriel du cache (livraison ou suppression)."""
+        entry = self._entries.pop((username, number), None)
+        if entry is not None:
+            self._size -= entry.size
+
+    @property
+    def hit_rate(self) -> float:
+        """Proportion des lectures servies par le cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return (f"Cache des courriels : {len(self._entries)} entrées,"
+                f" {self._size} octets, {self.hits} succès,"
+                f" {self.misses} échecs ({self.hit_rate:.0%})")
+
+
 class Server:
     """Serveur mail @glo2000.ca."""
 
@@ -23,6 +135,15 @@ class Server:
         - `_client_socs` une liste des sockets clients.
         - `_logged_users` un dictionnaire associant chaque
             socket client à un nom d'utilisateur.
+        - `_session_key` une clé secrète servant à signer les jetons
+            de session, lue depuis le fichier SESSION_KEY_FILENAME de
+            SERVER_DATA_DIR (créé au premier démarrage) pour que les jetons
+            restent valides après un redémarrage du serveur.
+        - `_session_not_before` un dictionnaire associant un nom
+            d'utilisateur à l'heure de sa dernière déconnexion; les jetons
+            émis avant sont révoqués. Conservé en mémoire seulement: un
+            redémarrage rend valides les jetons non expirés.
+        - `_email_cache` un cache LRU des courriels déjà lus.
 
         S'assure que les dossiers de données du serveur existent.
         """
@@ -31,9 +152,50 @@ class Server:
         self._server_socket.listen()
         self._client_socs: list[socket.socket] = []
         self._logged_users: dict[socket.socket, str]  = {}
+        self._session_key = self._load_session_key()
+        self._session_not_before: dict[str, float] = {}
+        self._email_cache = EmailCache()
+
+    @staticmethod
+    def _load_session_key() -> bytes:
+        """
+        Lit la clé de signature des jetons de session, ou la génère et
+        l'enregistre si elle n'existe pas encore ou est trop courte
+        (fichier vide ou tronqué).
+
+        La nouvelle clé est écrite dans un fichier temporaire puis renommée,
+        pour qu'une écriture partielle ne soit jamais relue comme clé.
+        """
+        os.makedirs(gloutils.SERVER_DATA_DIR, exist_ok=True)
+        key_path = os.path.join(gloutils.SERVER_DATA_DIR, gloutils.SESSION_KEY_FILENAME)
+        try:
+            with open(key_path, 'rb') as key_file:
+                key = key_file.read()
+            if len(key) >= SESSION_KEY_SIZE:
+                return key
+        except FileNotFoundError:
+            pass
+
+        key = os.urandom(SESSION_KEY_SIZE)
+        tmp_path = f"{key_path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as key_file:
+            key_file.write(key)
+            key_file.flush()
+            os.fsync(key_file.fileno())
+        os.replace(tmp_path, key_path)
+        return key
+
+    def cache_stats(self) -> str:
+        """Retourne les statistiques du cache des courriels."""
+        return str(self._email_cache)
 
     def cleanup(self) -> None:
-        """Ferme toutes les connexions résiduelles."""
+        """
+        Ferme toutes les connexions résiduelles et affiche les
+        statistiques du cache des courriels.
+        """
+        print(self.cache_stats())
         for client_soc in self._client_socs:
             client_soc.close()
         self._server_socket.close()
@@ -91,7 +253,7 @@ class Server:
 
         self._logged_users[client_soc] = _username
 
-        return gloutils.GloMessage(header=gloutils.Headers.OK)
+        return self._session_message(_username)
 
     def _login(self, client_soc: socket.socket, payload: gloutils.AuthPayload
                ) -> gloutils.GloMessage:
@@ -105,7 +267,8 @@ class Server:
         password = payload["password"]
 
         # On vérifie si l'utilisateur existe dans la base de données
-        if username not in os.listdir(gloutils.SERVER_DATA_DIR):
+        if (username not in os.listdir(gloutils.SERVER_DATA_DIR)
+                or not os.path.isdir(os.path.join(gloutils.SERVER_DATA_DIR, username))):
             error_payload = gloutils.ErrorPayload(error_message="Le nom d'utilisateur n'est pas dans la base de données.")
             return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
 
@@ -121,6 +284,71 @@ class Server:
 
         # Tout est bon, on connecte le socket client à son username
         self._logged_users[client_soc] = username
+        return self._session_message(username)
+
+    def _sign_session(self, username: str, expiry: int) -> str:
+        """Calcule la signature HMAC du couple utilisateur/expiration."""
+        data = f"{username}:{expiry}".encode()
+        return hmac.new(self._session_key, data, hashlib.sha256).hexdigest()
+
+    def _session_message(self, username: str) -> gloutils.GloMessage:
+        """
+        Génère un jeton de session signé pour l'utilisateur et retourne
+        un succès le contenant.
+
+        Le jeton a la forme `username:expiration:signature`.
+        """
+        expiry = int(time.time()) + gloutils.SESSION_TOKEN_LIFETIME
+        signature = self._sign_session(username, expiry)
+        session_payload = gloutils.SessionPayload(token=f"{username}:{expiry}:{signature}")
+        return gloutils.GloMessage(header=gloutils.Headers.OK, payload=session_payload)
+
+    def _resume_session(self, client_soc: socket.socket,
+                        payload: gloutils.SessionPayload
+                        ) -> gloutils.GloMessage:
+        """
+        Vérifie le jeton de session fourni, sans accès au disque.
+
+        Si le jeton est authentique, non expiré et émis après la dernière
+        déconnexion de l'utilisateur, associe le socket à l'utilisateur et
+        retourne un succès avec le même jeton: l'expiration n'est jamais
+        repoussée, il faut se reconnecter avec le mot de passe.
+        Sinon retourne un message d'erreur.
+        """
+        # Seule la forme canonique username:chiffres:hex est acceptée
+        token = payload.get("token") if isinstance(payload, dict) else None
+        match = re.fullmatch(r"(.+):([0-9]+):([0-9a-f]{64})", token) if isinstance(token, str) else None
+        if match is None:
+            error_payload = gloutils.ErrorPayload(error_message="Le jeton de session est invalide.")
+            return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
+        username, expiry, signature = match.group(1), int(match.group(2)), match.group(3)
+
+        # On compare les signatures en temps constant
+        if not hmac.compare_digest(signature.encode(), self._sign_session(username, expiry).encode()):
+            error_payload = gloutils.ErrorPayload(error_message="Le jeton de session est invalide.")
+            return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
+
+        if expiry < time.time():
+            error_payload = gloutils.ErrorPayload(error_message="Le jeton de session a expiré.")
+            return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
+
+        issued_at = expiry - gloutils.SESSION_TOKEN_LIFETIME
+        if issued_at <= self._session_not_before.get(username, 0):
+            error_payload = gloutils.ErrorPayload(error_message="Le jeton de session a été révoqué.")
+            return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
+
+        self._logged_users[client_soc] = username
+        session_payload = gloutils.SessionPayload(token=token)
+        return gloutils.GloMessage(header=gloutils.Headers.OK, payload=session_payload)
+
+    def _logout(self, client_soc: socket.socket) -> gloutils.GloMessage:
+        """
+        Dissocie le socket de son utilisateur et révoque les jetons de
+        session émis jusqu'ici pour cet utilisateur.
+        """
+        username = self._logged_users.pop(client_soc, None)
+        if username is not None:
+            self._session_not_before[username] = time.time()
         return gloutils.GloMessage(header=gloutils.Headers.OK)
 
     def _send_email(self, client_soc: socket.socket, payload: gloutils.EmailContentPayload
@@ -140,10 +368,13 @@ class Server:
             recipient_name = recipient.split("@")[0]
             recipient_path = os.path.join(gloutils.SERVER_DATA_DIR, recipient_name)
 
-            if recipient_name in os.listdir(gloutils.SERVER_DATA_DIR):
-                email_path = os.path.join(recipient_path, f"email_{len(os.listdir(recipient_path)) + 1}.json")
+            if recipient_name in os.listdir(gloutils.SERVER_DATA_DIR) and os.path.isdir(recipient_path):
+                # Seuls les fichiers de courriel comptent (pas le fichier pass)
+                number = max(self._email_numbers(recipient_name), default=0) + 1
+                email_path = os.path.join(recipient_path, f"email_{number}.json")
                 with open(email_path, 'w', encoding='utf-8') as email_file:
                     json.dump(payload, email_file)
+                self._email_cache.invalidate(recipient_name, number)
                 return gloutils.GloMessage(header=gloutils.Headers.OK)
             else:
                 lost_path = os.path.join(gloutils.SERVER_LOST_DIR, f"lost_email_{len(os.listdir(gloutils.SERVER_LOST_DIR)) + 1}.json")
@@ -156,23 +387,134 @@ class Server:
             error_payload = gloutils.ErrorPayload(error_message="Le destinataire est externe. L'envoi a échoué.")
             return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
 
+    @staticmethod
+    def _email_numbers(username: str) -> list[int]:
+        """Retourne les numéros des fichiers `email_N.json` de l'utilisateur."""
+        user_path = os.path.join(gloutils.SERVER_DATA_DIR, username)
+        return sorted(int(match.group(1)) for match in
+                      (re.fullmatch(r"email_(\d+)\.json", filename)
+                       for filename in os.listdir(user_path))
+                      if match is not None)
+
+    @staticmethod
+    def _read_email_file(username: str, number: int) -> gloutils.EmailContentPayload:
+        """
+        Lit le courriel `number` de l'utilisateur sur le disque.
+
+        Lève FileNotFoundError si le courriel n'existe pas.
+        """
+        email_path = os.path.join(gloutils.SERVER_DATA_DIR, username, f"email_{number}.json")
+        with open(email_path, 'r', encoding='utf-8') as email_file:
+            return json.load(email_file)
+
+    def _email_summary(self, username: str, number: int) -> str:
+        """
+        Retourne la ligne de sommaire du courriel, depuis le cache si
+        possible. Seul le sommaire est mis en cache.
+        """
+        entry = self._email_cache.get(username, number, with_payload=False)
+        if entry is None:
+            payload = self._read_email_file(username, number)
+            entry = self._email_cache.put(username, number, payload, summary_only=True)
+        return entry.summary
+
+    def _load_email(self, username: str, number: int) -> _CachedEmail:
+        """
+        Retourne le courriel `number` de l'utilisateur, depuis le cache
+        si possible, sinon en le lisant sur le disque.
+
+        Lève FileNotFoundError si le courriel n'existe pas.
+        """
+        entry = self._email_cache.get(username, number)
+        if entry is None:
+            payload = self._read_email_file(username, number)
+            entry = self._email_cache.put(username, number, payload)
+        return entry
+
+    def _get_email_list(self, client_soc: socket.socket) -> gloutils.GloMessage:
+        """
+        Retourne la liste des courriels de l'utilisateur, formatés avec le
+        gabarit `SUBJECT_DISPLAY`, ou un message d'erreur.
+        """
+        username = self._logged_users.get(client_soc)
+        if username is None:
+            error_payload = gloutils.ErrorPayload(error_message="L'utilisateur n'est pas connecté.")
+            return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
+
+        email_list = [self._email_summary(username, number)
+                      for number in self._email_numbers(username)]
+
+        list_payload = gloutils.EmailListPayload(email_list=email_list)
+        return gloutils.GloMessage(header=gloutils.Headers.OK, payload=list_payload)
+
+    def _get_email(self, client_soc: socket.socket,
+                   payload: gloutils.EmailChoicePayload) -> gloutils.GloMessage:
+        """
+        Retourne le courriel choisi, désigné par le numéro affiché dans
+        la liste, ou un message d'erreur.
+        """
+        username = self._logged_users.get(client_soc)
+        if username is None:
+            error_payload = gloutils.ErrorPayload(error_message="L'utilisateur n'est pas connecté.")
+            return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
+
+        # Le numéro sert de clé de cache et de nom de fichier
+        choice = payload.get("choice") if isinstance(payload, dict) else None
+        if type(choice) is not int or choice < 1:
+            error_payload = gloutils.ErrorPayload(error_message="Le choix de courriel est invalide.")
+            return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
+
+        try:
+            entry = self._load_email(username, choice)
+        except FileNotFoundError:
+            error_payload = gloutils.ErrorPayload(error_message="Le courriel demandé n'existe pas.")
+            return gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload)
+        return gloutils.GloMessage(header=gloutils.Headers.OK, payload=entry.payload)
+
+    @staticmethod
+    def _send(client_soc: socket.socket, message: gloutils.GloMessage) -> None:
+        """Encode le message en JSON (entête en entier) et le transmet."""
+        glosocket.snd_mesg(client_soc, json.dumps(message))
+
     def handle_client(self, client_soc: socket.socket) -> None:
-        message = glosocket.recv_mesg(client_soc)
-        rep: gloutils.GloMessage = eval(message)
-        if rep.get("header") == gloutils.Headers.AUTH_LOGIN:
-            self.send_conection_confirmation(rep, client_soc)
-        elif rep["header"] == gloutils.Headers.AUTH_REGISTER:
-            self._create_account(client_soc, rep["payload"])
-        elif rep["header"] == gloutils.Headers.AUTH_LOGIN:
-            self._login(client_soc, rep["payload"])
-        elif rep["header"] == gloutils.Headers.EMAIL_SENDING:
+        try:
+            message = glosocket.recv_mesg(client_soc)
+        except glosocket.GLOSocketError:
+            self._remove_client(client_soc)
+            return
+
+        try:
+            rep: gloutils.GloMessage = json.loads(message)
+        except json.JSONDecodeError:
+            rep = None
+        if not isinstance(rep, dict):
+            error_payload = gloutils.ErrorPayload(error_message="Le message reçu est invalide.")
+            self._send(client_soc, gloutils.GloMessage(header=gloutils.Headers.ERROR, payload=error_payload))
+            return
+
+        header = rep.get("header")
+        if header == gloutils.Headers.AUTH_REGISTER:
+            response = self._create_account(client_soc, rep["payload"])
+            self._send(client_soc, response)
+        elif header == gloutils.Headers.AUTH_LOGIN:
+            response = self._login(client_soc, rep["payload"])
+            self._send(client_soc, response)
+        elif header == gloutils.Headers.AUTH_RESUME:
+            response = self._resume_session(client_soc, rep.get("payload"))
+            self._send(client_soc, response)
+        elif header == gloutils.Headers.AUTH_LOGOUT:
+            response = self._logout(client_soc)
+            self._send(client_soc, response)
+        elif header == gloutils.Headers.EMAIL_SENDING:
             response = self._send_email(client_soc, rep["payload"])
-            glosocket.snd_mesg(client_soc, str(response))
-        elif rep["header"] == gloutils.Headers.INBOX_READING_REQUEST:
-            self._get_email_list(client_soc)
-        elif rep["header"] == gloutils.Headers.INBOX_READING_CHOICE:
-            self._get_email(client_soc, rep["payload"])
-        elif rep["header"] == gloutils.Headers.STATS_REQUEST:
+            self._send(client_soc, response)
+        elif header == gloutils.Headers.INBOX_READING_REQUEST:
+            response = self._get_email_list(client_soc)
+            self._send(client_soc, response)
+        elif header == gloutils.Headers.INBOX_READING_CHOICE:
+            response = self._get_email(client_soc, rep.get("payload"))
+            self._send(client_soc, response)
+        elif header == gloutils.Headers.STATS_REQUEST:
             self._get_stats(client_soc)
 
     def run(self):
@@ -11,6 +11,8 @@ SERVER_DATA_DIR = "glo_server_data"
 SERVER_LOST_DIR = "LOST"
 SERVER_DOMAIN = "glo2000.ca"
 PASSWORD_FILENAME = "pass"  # nosec:B105
+SESSION_KEY_FILENAME = "_session_key"
+SESSION_TOKEN_LIFETIME = 3600  # secondes
 
 CLIENT_AUTH_CHOICE = """Menu de connexion
 1. Créer un compte
@@ -47,6 +49,7 @@ class Headers(enum.IntEnum):
     AUTH_REGISTER = enum.auto()
     AUTH_LOGIN = enum.auto()
     AUTH_LOGOUT = enum.auto()
+    AUTH_RESUME = enum.auto()
 
     INBOX_READING_REQUEST = enum.auto()
     INBOX_READING_CHOICE = enum.auto()
@@ -67,6 +70,11 @@ class AuthPayload(TypedDict, total=True):
     password: str
 
 
+class SessionPayload(TypedDict, total=True):
+    """Payload pour le jeton de session (succès d'authentification/RESUME)."""
+    token: str
+
+
 class EmailContentPayload(TypedDict, total=True):
     """Payload pour les transferts de courriels."""
     sender: str
@@ -100,8 +108,9 @@ class GloMessage(TypedDict, total=False):
     certaines entêtes n'ont pas besoin de payload.
     """
     header: Headers
-    payload: Union[ErrorPayload, AuthPayload, EmailContentPayload,
-                   EmailListPayload, EmailChoicePayload, StatsPayload]
+    payload: Union[ErrorPayload, AuthPayload, SessionPayload,
+                   EmailContentPayload, EmailListPayload,
+                   EmailChoicePayload, StatsPayload]
 
 
 def get_current_utc_time() -> str: